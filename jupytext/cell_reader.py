@@ -2,9 +2,18 @@
 
 import re
 from copy import copy
-from nbformat.v4.nbbase import new_code_cell, new_raw_cell, new_markdown_cell
+from nbformat.v4 import nbformat_minor
+from nbformat.notebooknode import NotebookNode, from_dict
 from .languages import _SCRIPT_EXTENSIONS
 
+# Cells have an id in nbformat 4.5 (nbformat>=5.1)
+try:
+    from nbformat.v4.nbbase import random_cell_id
+except ImportError:
+    random_cell_id = None
+if nbformat_minor < 5:
+    random_cell_id = None
+
 # Sphinx Gallery is an optional dependency. And we intercept the SyntaxError for #301
 try:
     from sphinx_gallery.notebook import rst2md
@@ -17,10 +26,23 @@ from .stringparser import StringParser
 from .magics import uncomment_magic, is_magic, unescape_code_start, need_explicit_marker
 from .pep8 import pep8_lines_between_cells
 
-_BLANK_LINE = re.compile(r"^\s*$")
 _PY_INDENTED = re.compile(r"^\s")
 
 
+def new_cell(cell_type, source, metadata):
+    """Same as nbformat's new_code_cell, new_markdown_cell or new_raw_cell,
+    but without the schema validation of each cell"""
+    if cell_type == 'code':
+        cell = NotebookNode(cell_type='code', metadata=from_dict(metadata),
+                            execution_count=None, source=source, outputs=[])
+    else:
+        cell = NotebookNode(cell_type='markdown' if cell_type == 'markdown' else 'raw',
+                            source=source, metadata=from_dict(metadata))
+    if random_cell_id is not None:
+        cell['id'] = random_cell_id()
+    return cell
+
+
 def uncomment(lines, prefix='#'):
     """Remove prefix and space, or only prefix, when possible"""
     if not prefix:
@@ -42,14 +64,15 @@ def paragraph_is_fully_commented(lines, comment, main_language):
             if is_magic(line, main_language):
                 return False
             continue
-        return i > 0 and _BLANK_LINE.match(line)
+        return i > 0 and not line.strip()
     return True
 
 
-def next_code_is_indented(lines):
-    """Is the next unescaped line indented?"""
-    for line in lines:
-        if _BLANK_LINE.match(line):
+def next_code_is_indented(lines, start=0):
+    """Is the next unescaped line (at or after position start) indented?"""
+    for i in range(start, len(lines)):
+        line = lines[i]
+        if not line.strip():
             continue
         return _PY_INDENTED.match(line)
     return False
@@ -72,7 +95,7 @@ def last_two_lines_blank(source):
     """Are the two last lines blank, and not the third last one?"""
     if len(source) < 3:
         return False
-    return not _BLANK_LINE.match(source[-3]) and _BLANK_LINE.match(source[-2]) and _BLANK_LINE.match(source[-1])
+    return source[-3].strip() and not source[-2].strip() and not source[-1].strip()
 
 
 class BaseCellReader(object):
@@ -122,13 +145,6 @@ class BaseCellReader(object):
         # Parse cell till its end and set content, lines_to_next_cell
         pos_next_cell = self.find_cell_content(lines)
 
-        if self.cell_type == 'code':
-            new_cell = new_code_cell
-        elif self.cell_type == 'markdown':
-            new_cell = new_markdown_cell
-        else:
-            new_cell = new_raw_cell
-
         if not self.metadata:
             self.metadata = {}
 
@@ -143,7 +159,7 @@ class BaseCellReader(object):
         if self.language:
             self.metadata['language'] = self.language
 
-        return new_cell(source='\n'.join(self.content), metadata=self.metadata), pos_next_cell
+        return new_cell(self.cell_type, '\n'.join(self.content), self.metadata), pos_next_cell
 
     def metadata_and_language_from_option_line(self, line):
         """Parse code options on the given line. When a start of a code cell
@@ -211,13 +227,13 @@ class BaseCellReader(object):
 
         # Explicit end of cell marker?
         if (next_cell_start + 1 < len(lines) and
-                _BLANK_LINE.match(lines[next_cell_start]) and
-                not _BLANK_LINE.match(lines[next_cell_start + 1])):
+                not lines[next_cell_start].strip() and
+                lines[next_cell_start + 1].strip()):
             next_cell_start += 1
         elif (self.explicit_eoc and next_cell_start + 2 < len(lines) and
-              _BLANK_LINE.match(lines[next_cell_start]) and
-              _BLANK_LINE.match(lines[next_cell_start + 1]) and
-              not _BLANK_LINE.match(lines[next_cell_start + 2])):
+              not lines[next_cell_start].strip() and
+              not lines[next_cell_start + 1].strip() and
+              lines[next_cell_start + 2].strip()):
             next_cell_start += 2
 
         self.lines_to_next_cell = count_lines_to_next_cell(
@@ -331,12 +347,12 @@ class MarkdownCellReader(BaseCellReader):
                     in_explicit_code_block = False
                     continue
 
-                if prev_blank and line.startswith('    ') and not _BLANK_LINE.match(line):
+                if prev_blank and line.startswith('    ') and line.strip():
                     in_indented_code_block = True
                     prev_blank = 0
                     continue
 
-                if in_indented_code_block and not _BLANK_LINE.match(line) and not line.startswith('    '):
+                if in_indented_code_block and line.strip() and not line.startswith('    '):
                     in_indented_code_block = False
 
                 if in_indented_code_block or in_explicit_code_block:
@@ -369,7 +385,7 @@ class MarkdownCellReader(BaseCellReader):
                 if self.split_at_heading and line.startswith('#') and prev_blank >= 1:
                     return i - 1, i, False
 
-                if _BLANK_LINE.match(lines[i]):
+                if not lines[i].strip():
                     prev_blank += 1
                 elif prev_blank >= 2:
                     return i - 2, i, True
@@ -459,7 +475,7 @@ class RScriptCellReader(ScriptCellReader):
             self.cell_type = 'markdown'
             for i, line in enumerate(lines):
                 if not line.startswith("#'"):
-                    if _BLANK_LINE.match(line):
+                    if not line.strip():
                         return i, i + 1, False
                     return i, i, False
 
@@ -483,17 +499,17 @@ class RScriptCellReader(ScriptCellReader):
             parser.read_line(line)
 
             if self.start_code_re.match(line) or (self.markdown_prefix and line.startswith(self.markdown_prefix)):
-                if i > 0 and _BLANK_LINE.match(lines[i - 1]):
-                    if i > 1 and _BLANK_LINE.match(lines[i - 2]):
+                if i > 0 and not lines[i - 1].strip():
+                    if i > 1 and not lines[i - 2].strip():
                         return i - 2, i, False
                     return i - 1, i, False
                 return i, i, False
 
-            if _BLANK_LINE.match(line):
-                if not next_code_is_indented(lines[i:]):
+            if not line.strip():
+                if not next_code_is_indented(lines, i):
                     if i > 0:
                         return i, i + 1, False
-                    if len(lines) > 1 and not _BLANK_LINE.match(lines[1]):
+                    if len(lines) > 1 and lines[1].strip():
                         return 1, 1, False
                     return 1, 2, False
 
@@ -576,7 +592,7 @@ class LightScriptCellReader(ScriptCellReader):
                 and paragraph_is_fully_commented(lines, self.comment, self.default_language):
             self.cell_type = 'markdown'
             for i, line in enumerate(lines):
-                if _BLANK_LINE.match(line):
+                if not line.strip():
                     return i, i + 1, False
             return len(lines), len(lines), False
 
@@ -610,7 +626,7 @@ class LightScriptCellReader(ScriptCellReader):
             # Simple code pattern in LightScripts must be preceded with a blank line
             if self.start_code_re.match(line) or (
                     self.simple_start_code_re and self.simple_start_code_re.match(line) and
-                    (self.cell_marker_start or i == 0 or _BLANK_LINE.match(lines[i - 1]))):
+                    (self.cell_marker_start or i == 0 or not lines[i - 1].strip())):
 
                 if self.explicit_end_marker_required:
                     # Metadata here was conditioned on finding an explicit end marker
@@ -618,8 +634,8 @@ class LightScriptCellReader(ScriptCellReader):
                     self.metadata = None
                     self.language = None
 
-                if i > 0 and _BLANK_LINE.match(lines[i - 1]):
-                    if i > 1 and _BLANK_LINE.match(lines[i - 2]):
+                if i > 0 and not lines[i - 1].strip():
+                    if i > 1 and not lines[i - 2].strip():
                         return i - 2, i, False
                     return i - 1, i, False
                 return i, i, False
@@ -627,11 +643,11 @@ class LightScriptCellReader(ScriptCellReader):
             if not self.ignore_end_marker and self.end_code_re:
                 if self.end_code_re.match(line):
                     return i, i + 1, True
-            elif _BLANK_LINE.match(line):
-                if not next_code_is_indented(lines[i:]):
+            elif not line.strip():
+                if not next_code_is_indented(lines, i):
                     if i > 0:
                         return i, i + 1, False
-                    if len(lines) > 1 and not _BLANK_LINE.match(lines[1]):
+                    if len(lines) > 1 and lines[1].strip():
                         return 1, 1, False
                     return 1, 2, False
 
@@ -706,7 +722,7 @@ class DoublePercentScriptCellReader(LightScriptCellReader):
 
         if last_two_lines_blank(lines[:next_cell]):
             return next_cell - 2, next_cell, False
-        if next_cell > 0 and _BLANK_LINE.match(lines[next_cell - 1]):
+        if next_cell > 0 and not lines[next_cell - 1].strip():
             return next_cell - 1, next_cell, False
         return next_cell, next_cell, False
 
@@ -764,7 +780,7 @@ class SphinxGalleryScriptCellReader(ScriptCellReader):  # pylint: disable=W0223
         if self.cell_type == 'markdown':
             # Empty cell "" or ''
             if len(self.markdown_marker) <= 2:
-                if len(lines) == 1 or _BLANK_LINE.match(lines[1]):
+                if len(lines) == 1 or not lines[1].strip():
                     return 0, 2, True
                 return 0, 1, True
 
@@ -777,15 +793,14 @@ class SphinxGalleryScriptCellReader(ScriptCellReader):  # pylint: disable=W0223
                             end_of_cell = i
                         else:
                             end_of_cell = i + 1
-                        if len(lines) <= i + 1 or _BLANK_LINE.match(
-                                lines[i + 1]):
+                        if len(lines) <= i + 1 or not lines[i + 1].strip():
                             return end_of_cell, i + 2, explicit_end_of_cell_marker
                         return end_of_cell, i + 1, explicit_end_of_cell_marker
             else:
                 # 20 # or more
                 for i, line in enumerate(lines[1:], 1):
                     if not line.startswith(self.comment):
-                        if _BLANK_LINE.match(line):
+                        if not line.strip():
                             return i, i + 1, False
                         return i, i, False
 
@@ -797,7 +812,7 @@ class SphinxGalleryScriptCellReader(ScriptCellReader):  # pylint: disable=W0223
                     continue
 
                 if self.start_of_new_markdown_cell(line):
-                    if i > 0 and _BLANK_LINE.match(lines[i - 1]):
+                    if i > 0 and not lines[i - 1].strip():
                         return i - 1, i, False
                     return i, i, False
                 parser.read_line(line)
@@ -10,7 +10,7 @@ from .metadata_filter import filter_metadata
 from .magics import comment_magic, escape_code_start, need_explicit_marker
 from .cell_reader import LightScriptCellReader, MarkdownCellReader, RMarkdownCellReader
 from .languages import _SCRIPT_EXTENSIONS
-from .pep8 import pep8_lines_between_cells
+from .pep8 import pep8_lines_between_cell_and_lookahead
 
 
 def cell_source(cell):
@@ -93,9 +93,9 @@ class BaseCellExporter(object):
         if self.is_code():
             return self.code_to_text()
 
-        source = copy(self.source)
+        source = self.source
         if not self.comment:
-            escape_code_start(source, self.ext, None)
+            source = escape_code_start(copy(source), self.ext, None)
         return self.markdown_to_text(source)
 
     def markdown_to_text(self, source):
@@ -124,8 +124,9 @@ class BaseCellExporter(object):
         """Return the text representation of this cell as a code cell"""
         raise NotImplementedError('This method must be implemented in a sub-class')
 
-    def remove_eoc_marker(self, text, next_text):
-        """Remove end-of-cell marker when possible"""
+    def remove_eoc_marker(self, text, next_lookahead):
+        """Remove end-of-cell marker when possible. The next lines are summarized
+        in next_lookahead, cf. lines_lookahead"""
         # pylint: disable=W0613,R0201
         return text
 
@@ -239,6 +240,9 @@ class LightScriptCellExporter(BaseCellExporter):
         for key in ['endofcell']:
             if key in self.unfiltered_metadata:
                 self.metadata[key] = self.unfiltered_metadata[key]
+        # default start and end of cell markers, used in remove_eoc_marker
+        self.default_cell_marker_start = self.comment + ' +'
+        self.default_cell_marker_end = self.comment + ' -'
 
     def is_code(self):
         # Treat markdown cells with metadata as code cells (#66)
@@ -305,14 +309,14 @@ class LightScriptCellExporter(BaseCellExporter):
 
         return False
 
-    def remove_eoc_marker(self, text, next_text):
+    def remove_eoc_marker(self, text, next_lookahead):
         """Remove end of cell marker when next cell has an explicit start marker"""
         if self.cell_marker_start:
             return text
 
-        if self.is_code() and text[-1] == self.comment + ' -':
+        if text[-1] == self.default_cell_marker_end and self.is_code():
             # remove end of cell marker when redundant with next explicit marker
-            if not next_text or next_text[0].startswith(self.comment + ' +'):
+            if next_lookahead is None or next_lookahead[0].startswith(self.default_cell_marker_start):
                 text = text[:-1]
                 # When we do not need the end of cell marker, number of blank lines is the max
                 # between that required at the end of the cell, and that required before the next cell.
@@ -324,7 +328,7 @@ class LightScriptCellExporter(BaseCellExporter):
                 blank_lines = self.lines_to_end_of_cell_marker
                 if blank_lines is None:
                     # two blank lines when required by pep8
-                    blank_lines = pep8_lines_between_cells(text[:-1], next_text, self.ext)
+                    blank_lines = pep8_lines_between_cell_and_lookahead(text[:-1], next_lookahead, self.ext)
                     blank_lines = 0 if blank_lines < 2 else 2
                 text = text[:-1] + [''] * blank_lines + text[-1:]
 
@@ -165,27 +165,37 @@ if is_pandoc_available():
 NOTEBOOK_EXTENSIONS = list(dict.fromkeys(['.ipynb'] + [fmt.extension for fmt in JUPYTEXT_FORMATS]))
 EXTENSION_PREFIXES = ['.lgt', '.spx', '.pct', '.hyd', '.nb']
 
+# Sets for fast membership tests, and cache for get_format_implementation
+_NOTEBOOK_EXTENSIONS_SET = frozenset(NOTEBOOK_EXTENSIONS)
+_VALID_EXTENSIONS_SET = frozenset(NOTEBOOK_EXTENSIONS + ['.auto'])
+_FORMAT_IMPLEMENTATIONS = {}
+
 
 def get_format_implementation(ext, format_name=None):
     """Return the implementation for the desired format"""
+    implementation = _FORMAT_IMPLEMENTATIONS.get((ext, format_name))
+    if implementation is not None:
+        return implementation
+
     # remove pre-extension if any
-    ext = '.' + ext.split('.')[-1]
+    short_ext = '.' + ext.split('.')[-1]
 
     formats_for_extension = []
     for fmt in JUPYTEXT_FORMATS:
-        if fmt.extension == ext:
+        if fmt.extension == short_ext:
             if fmt.format_name == format_name or not format_name:
+                _FORMAT_IMPLEMENTATIONS[(ext, format_name)] = fmt
                 return fmt
             formats_for_extension.append(fmt.format_name)
 
     if formats_for_extension:
-        if ext in ['.md', '.markdown'] and format_name == 'pandoc':
+        if short_ext in ['.md', '.markdown'] and format_name == 'pandoc':
             raise JupytextFormatError('Please install pandoc>=2.7.2')
 
         raise JupytextFormatError("Format '{}' is not associated to extension '{}'. "
-                                  "Please choose one of: {}.".format(format_name, ext,
+                                  "Please choose one of: {}.".format(format_name, short_ext,
                                                                      ', '.join(formats_for_extension)))
-    raise JupytextFormatError("No format associated to extension '{}'".format(ext))
+    raise JupytextFormatError("No format associated to extension '{}'".format(short_ext))
 
 
 def read_metadata(text, ext):
@@ -561,7 +571,7 @@ def validate_one_format(jupytext_format):
     if 'extension' not in jupytext_format:
         raise JupytextFormatError('Missing format extension')
     ext = jupytext_format['extension']
-    if ext not in NOTEBOOK_EXTENSIONS + ['.auto']:
+    if ext not in _VALID_EXTENSIONS_SET:
         raise JupytextFormatError("Extension '{}' is not a notebook extension. Please use one of '{}'.".format(
             ext, "', '".join(NOTEBOOK_EXTENSIONS + ['.auto'])))
 
@@ -13,6 +13,12 @@ from .pep8 import pep8_lines_between_cells
 
 SafeRepresenter.add_representer(nbformat.NotebookNode, SafeRepresenter.represent_dict)
 
+# The LibYAML bindings are optional, and much faster than the pure Python loader
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 _HEADER_RE = re.compile(r"^---\s*$")
 _BLANK_RE = re.compile(r"^\s*$")
 _JUPYTER_RE = re.compile(r"^jupyter\s*:\s*$")
@@ -31,13 +37,10 @@ def insert_or_test_version_number():
 
 def uncomment_line(line, prefix):
     """Remove prefix (and space) from line"""
-    if not prefix:
+    if not prefix or not line.startswith(prefix):
         return line
-    if line.startswith(prefix + ' '):
-        return line[len(prefix) + 1:]
-    if line.startswith(prefix):
-        return line[len(prefix):]
-    return line
+    line = line[len(prefix):]
+    return line[1:] if line[:1] == ' ' else line
 
 
 def encoding_and_executable(notebook, metadata, ext):
@@ -183,7 +186,7 @@ def header_to_metadata_and_cell(lines, header_prefix, ext=None):
 
     if ended:
         if jupyter:
-            recursive_update(metadata, yaml.safe_load('\n'.join(jupyter))['jupyter'])
+            recursive_update(metadata, yaml.load('\n'.join(jupyter), Loader=SafeLoader)['jupyter'])
 
         lines_to_next_cell = 1
         if len(lines) > i + 1:
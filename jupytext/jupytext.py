@@ -6,8 +6,10 @@ import sys
 import logging
 import warnings
 from copy import copy, deepcopy
+from itertools import repeat
 from nbformat.v4.rwbase import NotebookReader, NotebookWriter
-from nbformat.v4.nbbase import new_notebook, new_code_cell, NotebookNode
+from nbformat.v4.nbbase import new_code_cell, NotebookNode
+from nbformat.notebooknode import from_dict
 import nbformat
 from .formats import _VALID_FORMAT_OPTIONS
 from .formats import read_format_from_metadata, update_jupytext_formats_metadata, rearrange_jupytext_metadata
@@ -17,9 +19,12 @@ from .header import encoding_and_executable, insert_or_test_version_number
 from .metadata_filter import update_metadata_filters, filter_metadata
 from .cell_metadata import _IGNORE_CELL_METADATA
 from .languages import default_language_from_metadata_and_ext, set_main_and_cell_language
-from .pep8 import pep8_lines_between_cells
+from .pep8 import lines_lookahead, pep8_lines_between_cell_and_lookahead
 from .pandoc import md_to_notebook, notebook_to_md
 
+# Maximum number of distinct cells whose text representation is reused within a notebook
+_MAX_EXPORTED_CELLS_CACHE = 4096
+
 
 class TextNotebookConverter(NotebookReader, NotebookWriter):
     """A class that can read or write a Jupyter notebook as text"""
@@ -72,9 +77,10 @@ class TextNotebookConverter(NotebookReader, NotebookWriter):
             cells.append(new_code_cell(source='%matplotlib inline'))
 
         cell_metadata_json = False
+        cell_reader_class = self.implementation.cell_reader_class
 
         while lines:
-            reader = self.implementation.cell_reader_class(self.fmt, default_language)
+            reader = cell_reader_class(self.fmt, default_language)
             cell, pos = reader.read(lines)
             cells.append(cell)
             cell_metadata_json = cell_metadata_json or reader.cell_metadata_json
@@ -100,7 +106,12 @@ class TextNotebookConverter(NotebookReader, NotebookWriter):
                 filtered_cells.append(cell)
             cells = filtered_cells
 
-        return new_notebook(cells=cells, metadata=metadata)
+        # Same as new_notebook(cells=cells, metadata=metadata), but without the schema validation
+        return NotebookNode(
+            nbformat=nbformat.v4.nbformat,
+            nbformat_minor=nbformat.v4.nbformat_minor,
+            metadata=from_dict(metadata),
+            cells=cells)
 
     def writes(self, nb, metadata=None, **kwargs):
         """Return the text representation of the notebook"""
@@ -123,11 +134,16 @@ class TextNotebookConverter(NotebookReader, NotebookWriter):
                 metadata=metadata,
                 cells=cells))
 
-        # Copy the notebook, in order to be sure we do not modify the original notebook
+        return '\n'.join(self.text_lines(nb, metadata))
+
+    def text_lines(self, nb, metadata=None):
+        """Return the lines of the text representation of the notebook (not for the pandoc format)"""
+        # Copy the notebook, in order to be sure we do not modify the original notebook.
+        # The metadata argument, when given, is already a copy that we are free to update.
         nb = NotebookNode(
             nbformat=nb.nbformat,
             nbformat_minor=nb.nbformat_minor,
-            metadata=deepcopy(metadata or nb.metadata),
+            metadata=metadata or deepcopy(nb.metadata),
             cells=nb.cells)
 
         metadata = nb.metadata
@@ -147,56 +163,93 @@ class TextNotebookConverter(NotebookReader, NotebookWriter):
         header.extend(header_content)
 
         cell_exporters = []
-        looking_for_first_markdown_cell = (self.implementation.format_name and
-                                           self.implementation.format_name.startswith('sphinx'))
+        texts = []
+        # Cells with no metadata are exported identically when they have the same type and source
+        exported_cells = {}
+        sphinx_format = bool(self.implementation.format_name and
+                             self.implementation.format_name.startswith('sphinx'))
+        looking_for_first_markdown_cell = sphinx_format
         split_at_heading = self.fmt.get('split_at_heading', False)
+        cell_exporter_class = self.implementation.cell_exporter_class
 
         for cell in nb.cells:
             if looking_for_first_markdown_cell and cell.cell_type == 'markdown':
-                cell.metadata.setdefault('cell_marker', '"""')
+                if 'cell_marker' not in cell.metadata:
+                    cell = copy(cell)
+                    cell.metadata = copy(cell.metadata)
+                    cell.metadata['cell_marker'] = '"""'
                 looking_for_first_markdown_cell = False
 
-            cell_exporters.append(self.implementation.cell_exporter_class(cell, default_language, self.fmt))
-
-        texts = [cell.cell_to_text() for cell in cell_exporters]
-        lines = []
-
-        # concatenate cells in reverse order to determine how many blank lines (pep8)
-        for i, cell in reversed(list(enumerate(cell_exporters))):
-            text = cell.remove_eoc_marker(texts[i], lines)
-
-            if i == 0 and self.implementation.format_name and \
-                    self.implementation.format_name.startswith('sphinx') and \
-                    (text in [['%matplotlib inline'], ['# %matplotlib inline']]):
+            key = None if cell.metadata else (cell.cell_type, cell.source)
+            if key is not None and key in exported_cells:
+                # The first exporter and text are only updated after this loop,
+                # so we copy them only when a duplicate is found
+                cell_exporter, text = exported_cells[key]
+                cell_exporter = copy(cell_exporter)
+                cell_exporter.metadata = copy(cell_exporter.metadata)
+                text = copy(text)
+            else:
+                cell_exporter = cell_exporter_class(cell, default_language, self.fmt)
+                text = cell_exporter.cell_to_text()
+                if key is not None and len(exported_cells) < _MAX_EXPORTED_CELLS_CACHE:
+                    exported_cells[key] = cell_exporter, text
+
+            cell_exporters.append(cell_exporter)
+            texts.append(text)
+
+        # is_code and the first line of each cell do not change from here on
+        is_code = [cell.is_code() for cell in cell_exporters]
+        first_lines = [text[0] if text else '' for text in texts]
+        markdown_format = self.ext in ['.md', '.markdown', '.Rmd']
+        extension = self.implementation.extension
+        last = len(cell_exporters) - 1
+        # what we need to know about the lines that follow the current cell
+        next_lookahead = None
+
+        # process cells in reverse order to determine how many blank lines (pep8)
+        for i in range(last, -1, -1):
+            cell = cell_exporters[i]
+            text = cell.remove_eoc_marker(texts[i], next_lookahead)
+
+            if i == 0 and sphinx_format and (text in [['%matplotlib inline'], ['# %matplotlib inline']]):
+                texts[i] = []
                 continue
 
             lines_to_next_cell = cell.lines_to_next_cell
             if lines_to_next_cell is None:
-                lines_to_next_cell = pep8_lines_between_cells(text, lines, self.implementation.extension)
+                lines_to_next_cell = pep8_lines_between_cell_and_lookahead(text, next_lookahead, extension)
 
-            text.extend([''] * lines_to_next_cell)
+            if lines_to_next_cell:
+                text.extend(repeat('', lines_to_next_cell))
 
             # two blank lines between markdown cells in Rmd when those do not have explicit region markers
-            if self.ext in ['.md', '.markdown', '.Rmd'] and not cell.is_code():
-                if (i + 1 < len(cell_exporters) and not cell_exporters[i + 1].is_code() and
-                        not texts[i][0].startswith('<!-- #') and
-                        not texts[i + 1][0].startswith('<!-- #') and
-                        (not split_at_heading or not (texts[i + 1] and texts[i + 1][0].startswith('#')))):
+            if markdown_format and not is_code[i]:
+                if (i < last and not is_code[i + 1] and
+                        not first_lines[i].startswith('<!-- #') and
+                        not first_lines[i + 1].startswith('<!-- #') and
+                        (not split_at_heading or not first_lines[i + 1].startswith('#'))):
                     text.append('')
 
             # "" between two consecutive code cells in sphinx
-            if self.implementation.format_name.startswith('sphinx') and cell.is_code():
-                if i + 1 < len(cell_exporters) and cell_exporters[i + 1].is_code():
+            if sphinx_format and is_code[i]:
+                if i < last and is_code[i + 1]:
                     text.append('""')
 
-            lines = text + lines
+            texts[i] = text
+            next_lookahead = lines_lookahead(text, next_lookahead, extension)
 
         if header_lines_to_next_cell is None:
-            header_lines_to_next_cell = pep8_lines_between_cells(header_content, lines, self.implementation.extension)
+            header_lines_to_next_cell = pep8_lines_between_cell_and_lookahead(header_content, next_lookahead,
+                                                                              extension)
+
+        if header_lines_to_next_cell:
+            header.extend(repeat('', header_lines_to_next_cell))
 
-        header.extend([''] * header_lines_to_next_cell)
+        # concatenate the cells once, in the forward order
+        for text in texts:
+            header.extend(text)
 
-        return '\n'.join(header + lines)
+        return header
 
 
 def reads(text, fmt, as_version=nbformat.NO_CONVERT, **kwargs):
@@ -263,8 +316,18 @@ def read(fp, as_version=nbformat.NO_CONVERT, fmt=None, **kwargs):
         if not isinstance(fmt, dict):
             fmt = long_form_one_format(fmt)
         fmt.update({'extension': ext})
-        with io.open(fp, encoding='utf-8') as stream:
-            return read(stream, as_version=as_version, fmt=fmt, **kwargs)
+        # decode the whole file at once, rather than chunk by chunk in a text stream
+        with io.open(fp, 'rb') as stream:
+            text = stream.read().decode('utf-8')
+        if '\r' in text:
+            # universal newlines, like in text mode
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        fmt = long_form_one_format(fmt)
+        if ext == '.ipynb':
+            notebook = nbformat.reads(text, as_version, **kwargs)
+            rearrange_jupytext_metadata(notebook.metadata)
+            return notebook
+        return reads(text, fmt, **kwargs)
 
     if fmt is not None:
         fmt = long_form_one_format(fmt)
@@ -286,6 +349,26 @@ def writes(notebook, fmt, version=nbformat.NO_CONVERT, **kwargs):
     :param kwargs: (not used) additional parameters for nbformat.writes
     :return: the text representation of the notebook
     """
+    metadata, fmt = metadata_and_format_for_writing(notebook, fmt)
+    return _writes(notebook, metadata, fmt, version, **kwargs)
+
+
+def _writes(notebook, metadata, fmt, version=nbformat.NO_CONVERT, **kwargs):
+    """Same as writes, with the metadata and format returned by metadata_and_format_for_writing"""
+    if fmt['extension'] == '.ipynb':
+        return nbformat.writes(
+            NotebookNode(
+                nbformat=notebook.nbformat,
+                nbformat_minor=notebook.nbformat_minor,
+                metadata=metadata,
+                cells=notebook.cells), version, **kwargs)
+
+    writer = TextNotebookConverter(fmt)
+    return writer.writes(notebook, metadata)
+
+
+def metadata_and_format_for_writing(notebook, fmt):
+    """Return a copy of the notebook metadata, and the complete format, for writing the notebook"""
     metadata = deepcopy(notebook.metadata)
     rearrange_jupytext_metadata(metadata)
     fmt = copy(fmt)
@@ -300,12 +383,7 @@ def writes(notebook, fmt, version=nbformat.NO_CONVERT, **kwargs):
         jupytext_metadata.pop('text_representation', {})
         if not jupytext_metadata:
             metadata.pop('jupytext', {})
-        return nbformat.writes(
-            NotebookNode(
-                nbformat=notebook.nbformat,
-                nbformat_minor=notebook.nbformat_minor,
-                metadata=metadata,
-                cells=notebook.cells), version, **kwargs)
+        return metadata, fmt
 
     if not format_name:
         format_name = format_name_for_ext(metadata, ext, explicit_default=False)
@@ -314,8 +392,7 @@ def writes(notebook, fmt, version=nbformat.NO_CONVERT, **kwargs):
         fmt['format_name'] = format_name
         update_jupytext_formats_metadata(metadata, fmt)
 
-    writer = TextNotebookConverter(fmt)
-    return writer.writes(notebook, metadata)
+    return metadata, fmt
 
 
 def write(nb, fp, version=nbformat.NO_CONVERT, fmt=None, **kwargs):
@@ -346,13 +423,25 @@ def write(nb, fp, version=nbformat.NO_CONVERT, fmt=None, **kwargs):
         fmt = long_form_one_format(fmt, update={'extension': ext})
         create_prefix_dir(fp, fmt)
 
-        with io.open(fp, 'w', encoding='utf-8') as stream:
+        with io.open(fp, 'w', encoding='utf-8', buffering=1 << 20) as stream:
             write(nb, stream, version=version, fmt=fmt, **kwargs)
             return
     else:
         assert fmt is not None, "'fmt' argument in jupytext.write is mandatory unless fp is a file name"
 
-    content = writes(nb, version=version, fmt=fmt, **kwargs)
+    metadata, fmt = metadata_and_format_for_writing(nb, fmt)
+    if fmt['extension'] != '.ipynb' and fmt.get('format_name') != 'pandoc':
+        # Write the text notebook line by line, rather than joining all the lines in a single string
+        lines = TextNotebookConverter(fmt).text_lines(nb, metadata) or [u'']
+        for line in lines[:-1]:
+            fp.write(u'{}\n'.format(line))
+        # Same as below: the text ends with a new line
+        last_line = lines[-1]
+        if last_line or len(lines) == 1:
+            fp.write(last_line if last_line.endswith(u'\n') else u'{}\n'.format(last_line))
+        return
+
+    content = _writes(nb, metadata, fmt, version, **kwargs)
     if isinstance(content, bytes):
         content = content.decode('utf8')
     fp.write(content)
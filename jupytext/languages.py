@@ -148,4 +148,5 @@ def comment_lines(lines, prefix):
     """Return commented lines"""
     if not prefix:
         return lines
-    return [prefix + ' ' + line if line else prefix for line in lines]
+    prefix_and_space = prefix + ' '
+    return [prefix_and_space + line if line else prefix for line in lines]
@@ -52,6 +52,21 @@ def metadata_filter_as_dict(metadata_config):
     return metadata_config
 
 
+_PARSED_METADATA_FILTERS = {}
+
+
+def parsed_metadata_filter(metadata_config):
+    """Same as metadata_filter_as_dict, but filters given as strings are parsed only once.
+    The returned dictionary is shared, and must not be modified"""
+    if not isinstance(metadata_config, str):
+        return metadata_filter_as_dict(metadata_config)
+
+    metadata_filter = _PARSED_METADATA_FILTERS.get(metadata_config)
+    if metadata_filter is None:
+        metadata_filter = _PARSED_METADATA_FILTERS[metadata_config] = metadata_filter_as_dict(metadata_config)
+    return metadata_filter
+
+
 def metadata_filter_as_string(metadata_filter):
     """Convert a filter, represented as a dictionary with 'additional' and 'excluded' entries, to a string"""
     if not isinstance(metadata_filter, dict):
@@ -107,8 +122,8 @@ def update_metadata_filters(metadata, jupyter_md, cell_metadata):
 
 def filter_metadata(metadata, user_filter, default_filter=''):
     """Filter the cell or notebook metadata, according to the user preference"""
-    default_filter = metadata_filter_as_dict(default_filter) or {}
-    user_filter = metadata_filter_as_dict(user_filter) or {}
+    default_filter = parsed_metadata_filter(default_filter) or {}
+    user_filter = parsed_metadata_filter(user_filter) or {}
 
     default_exclude = default_filter.get('excluded', [])
     default_include = default_filter.get('additional', [])
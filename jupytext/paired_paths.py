@@ -3,7 +3,7 @@
 import os
 from .formats import long_form_one_format, long_form_multiple_formats
 from .formats import short_form_one_format, short_form_multiple_formats
-from .formats import NOTEBOOK_EXTENSIONS
+from .formats import NOTEBOOK_EXTENSIONS, _NOTEBOOK_EXTENSIONS_SET
 
 
 class InconsistentPath(ValueError):
@@ -15,7 +15,7 @@ def base_path(main_path, fmt):
     """Given a path and options for a format (ext, suffix, prefix), return the corresponding base path"""
     if not fmt:
         base, ext = os.path.splitext(main_path)
-        if ext not in NOTEBOOK_EXTENSIONS:
+        if ext not in _NOTEBOOK_EXTENSIONS_SET:
             raise InconsistentPath("'{}' is not a notebook. Supported extensions are '{}'.".format(
                 main_path, "', '".join(NOTEBOOK_EXTENSIONS)))
         return base
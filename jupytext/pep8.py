@@ -4,6 +4,11 @@ from .stringparser import StringParser
 
 def next_instruction_is_function_or_class(lines):
     """Is the first non-empty, non-commented line of the cell either a function or a class?"""
+    return bool(_next_instruction_is_function_or_class(lines))
+
+
+def _next_instruction_is_function_or_class(lines):
+    """Same as next_instruction_is_function_or_class, but None when the lines do not tell"""
     for i, line in enumerate(lines):
         if not line.strip():  # empty line
             if i > 0 and not lines[i - 1].strip():
@@ -15,7 +20,7 @@ def next_instruction_is_function_or_class(lines):
             continue
         return False
 
-    return False
+    return None
 
 
 def cell_ends_with_function_or_class(lines):
@@ -57,6 +62,11 @@ def cell_ends_with_code(lines):
 
 def cell_has_code(lines):
     """Is there any code in this cell?"""
+    return bool(_cell_has_code(lines))
+
+
+def _cell_has_code(lines):
+    """Same as cell_has_code, but None when the lines do not tell"""
     for i, line in enumerate(lines):
         stripped_line = line.strip()
         if stripped_line.startswith('#'):
@@ -70,7 +80,30 @@ def cell_has_code(lines):
 
         return True
 
-    return False
+    return None
+
+
+def lines_lookahead(lines, next_lookahead, ext):
+    """What pep8_lines_between_cell_and_lookahead needs to know about the given lines, followed by
+    the lines summarized in next_lookahead: a tuple (first line, next instruction is a function or class,
+    has code), or None when there are no lines"""
+    if not lines:
+        return next_lookahead
+    if ext != '.py':
+        # only the first line is used
+        return lines[0], False, False
+
+    function_or_class = _next_instruction_is_function_or_class(lines)
+    has_code = _cell_has_code(lines)
+    if function_or_class is None or has_code is None:
+        # are the next lines relevant, i.e. not after two consecutive blank lines?
+        continued = next_lookahead is not None and (lines[-1].strip() or next_lookahead[0].strip())
+        if function_or_class is None:
+            function_or_class = bool(continued) and next_lookahead[1]
+        if has_code is None:
+            has_code = bool(continued) and next_lookahead[2]
+
+    return lines[0], function_or_class, has_code
 
 
 def pep8_lines_between_cells(prev_lines, next_lines, ext):
@@ -86,3 +119,18 @@ def pep8_lines_between_cells(prev_lines, next_lines, ext):
     if cell_ends_with_code(prev_lines) and next_instruction_is_function_or_class(next_lines):
         return 2
     return 1
+
+
+def pep8_lines_between_cell_and_lookahead(prev_lines, next_lookahead, ext):
+    """Same as pep8_lines_between_cells, with the next lines summarized by lines_lookahead"""
+    if next_lookahead is None:
+        return 1
+    if not prev_lines:
+        return 0
+    if ext != '.py':
+        return 1
+    if cell_ends_with_function_or_class(prev_lines):
+        return 2 if next_lookahead[2] else 1
+    if cell_ends_with_code(prev_lines) and next_lookahead[1]:
+        return 2
+    return 1
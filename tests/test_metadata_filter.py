@@ -1,7 +1,7 @@
 import pytest
 from nbformat.v4.nbbase import new_notebook
 from jupytext import reads, writes
-from jupytext.metadata_filter import filter_metadata, metadata_filter_as_dict
+from jupytext.metadata_filter import filter_metadata, metadata_filter_as_dict, parsed_metadata_filter
 
 
 def to_dict(keys):
@@ -20,6 +20,13 @@ def test_string_to_dict_conversion(metadata_filter_string, metadata_filter_dict)
     assert metadata_filter_as_dict(metadata_filter_string) == metadata_filter_dict
 
 
+def test_parsed_metadata_filter_is_parsed_once(metadata_filter_string='ExecuteTime, autoscroll, -hide_output'):
+    metadata_filter = parsed_metadata_filter(metadata_filter_string)
+    assert metadata_filter == metadata_filter_as_dict(metadata_filter_string)
+    assert parsed_metadata_filter(metadata_filter_string) is metadata_filter
+    assert metadata_filter_as_dict(metadata_filter_string) is not metadata_filter
+
+
 def test_metadata_filter_as_dict():
     assert metadata_filter_as_dict(True) == metadata_filter_as_dict('all')
     assert metadata_filter_as_dict(False) == metadata_filter_as_dict('-all')
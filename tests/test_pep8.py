@@ -1,8 +1,15 @@
+try:
+    import unittest.mock as mock
+except ImportError:
+    import mock
 import pytest
-from jupytext.compare import compare
+from nbformat.v4.nbbase import new_notebook, new_code_cell, new_markdown_cell
+import jupytext.pep8
+from jupytext.compare import compare, compare_notebooks
 from jupytext import read, reads, writes
 from jupytext.pep8 import next_instruction_is_function_or_class, cell_ends_with_function_or_class
 from jupytext.pep8 import cell_ends_with_code, cell_has_code, pep8_lines_between_cells
+from jupytext.pep8 import lines_lookahead, pep8_lines_between_cell_and_lookahead
 from .utils import list_notebooks
 
 
@@ -93,6 +100,50 @@ a = 5
     assert pep8_lines_between_cells(prev_lines, next_lines, '.py') == 1
 
 
+@pytest.mark.parametrize('prev_lines,next_lines', [(['x = 1'], []),
+                                                   (['x = 1'], ['# comment', '', 'def f():']),
+                                                   (['x = 1'], ['# comment', '', '', 'def f():']),
+                                                   (['def f():', '    pass'], ['# comment', '', '@decorator', '    y']),
+                                                   (['def f():', '    pass'], ['# comment', '', '', 'y = 2'])])
+def test_pep8_lines_between_cell_and_lookahead(prev_lines, next_lines):
+    expected = pep8_lines_between_cells(prev_lines, next_lines, '.py')
+    for i in range(len(next_lines) + 1):
+        for j in range(i, len(next_lines) + 1):
+            # the next lines, split into three cells
+            next_lookahead = lines_lookahead(next_lines[j:], None, '.py')
+            next_lookahead = lines_lookahead(next_lines[i:j], next_lookahead, '.py')
+            next_lookahead = lines_lookahead(next_lines[:i], next_lookahead, '.py')
+            assert pep8_lines_between_cell_and_lookahead(prev_lines, next_lookahead, '.py') == expected
+
+
+@pytest.mark.parametrize('fmt', ['py:light', 'py:percent', 'R:light'])
+def test_pep8_lines_are_found_in_linear_time(fmt, n=500):
+    nb = new_notebook(cells=[new_code_cell('x = 1')] +
+                      [new_markdown_cell('Markdown cell {}'.format(i)) for i in range(n)] +
+                      [new_code_cell('def f():\n    return 1')])
+    with mock.patch('jupytext.pep8._cell_has_code', wraps=jupytext.pep8._cell_has_code) as cell_has_code:
+        text = writes(nb, fmt)
+
+    # each line is scanned at most once
+    assert sum(len(call[0][0]) for call in cell_has_code.call_args_list) <= len(text.splitlines())
+    compare_notebooks(reads(text, fmt), nb)
+
+
+def test_pep8_lines_after_comment_only_cell(text="""x = 1
+
+
+# +
+# A comment
+# -
+
+def f():
+    return 1
+"""):
+    nb = reads(text, 'py')
+    assert len(nb.cells) == 3
+    compare(writes(nb, 'py'), text)
+
+
 def test_pep8():
     text = """import os
 
@@ -956,3 +956,35 @@ except:
     compare(py, text)
     nb2 = jupytext.reads(py, 'py')
     compare_notebooks(nb2, nb)
+
+
+def test_identical_cells_are_exported_consistently(no_jupytext_version_number,
+                                                   nb=new_notebook(cells=[new_code_cell('1 + 1\n\n2 + 2'),
+                                                                          new_code_cell('1 + 1\n\n2 + 2'),
+                                                                          new_markdown_cell('A markdown cell'),
+                                                                          new_markdown_cell('A markdown cell'),
+                                                                          new_code_cell('1 + 1\n\n2 + 2')]),
+                                                   text="""# +
+1 + 1
+
+2 + 2
+
+# +
+1 + 1
+
+2 + 2
+# -
+
+# A markdown cell
+
+# A markdown cell
+
+# +
+1 + 1
+
+2 + 2
+"""):
+    py = jupytext.writes(nb, 'py')
+    compare(py, text)
+    nb2 = jupytext.reads(py, 'py')
+    compare_notebooks(nb2, nb)
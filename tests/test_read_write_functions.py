@@ -1,9 +1,18 @@
 from io import StringIO
+from itertools import product
 from pathlib import Path
+
+try:
+    import unittest.mock as mock
+except ImportError:
+    import mock
+import pytest
 import nbformat
-from nbformat.v4.nbbase import new_notebook, new_markdown_cell
+from nbformat.v4.nbbase import new_notebook, new_markdown_cell, new_code_cell, new_raw_cell, NotebookNode
 import jupytext
 from jupytext.compare import compare
+from jupytext.formats import JupytextFormatError
+from .utils import list_notebooks
 
 
 def test_simple_hook(tmpdir):
@@ -76,3 +85,73 @@ def test_read_py_percent_from_stream():
     nb = jupytext.read(stream())
     nb2 = jupytext.read(stream(), fmt='py:percent')
     compare(nb2, nb)
+
+
+@pytest.mark.parametrize('nb_file,fmt', product(list_notebooks('ipynb_py'), ['py:light', 'py:percent', 'md', 'Rmd']))
+def test_write_to_stream_matches_writes(nb_file, fmt):
+    nb = jupytext.read(nb_file)
+    text = jupytext.writes(nb, fmt)
+    if not text.endswith(u'\n'):
+        text += u'\n'
+
+    stream = StringIO()
+    jupytext.write(nb, stream, fmt=fmt)
+    compare(stream.getvalue(), text)
+
+
+@pytest.mark.parametrize('fmt', ['py:light', 'py:percent', 'md'])
+def test_write_empty_notebook_to_stream(fmt, no_jupytext_version_number):
+    stream = StringIO()
+    jupytext.write(new_notebook(), stream, fmt=fmt)
+    compare(stream.getvalue(), jupytext.writes(new_notebook(), fmt) + u'\n')
+
+
+@pytest.mark.parametrize('nb_file', list_notebooks('ipynb_py') + list_notebooks('ipynb_R'))
+def test_notebook_read_from_text_is_valid(nb_file, new_cell={'code': new_code_cell,
+                                                             'markdown': new_markdown_cell,
+                                                             'raw': new_raw_cell}):
+    nb = jupytext.read(nb_file)
+    for fmt in ['py:light', 'py:percent', 'md', 'Rmd']:
+        nb2 = jupytext.reads(jupytext.writes(nb, fmt), fmt)
+        for cell in nb2.cells:
+            assert set(cell) == set(new_cell[cell.cell_type]())
+        nbformat.validate(nb2)
+
+
+def test_read_file_with_windows_line_endings(tmpdir, text='# %% [markdown]\n# A markdown cell\n\n# %%\n1 + 1\n'):
+    py_file = tmpdir.join('notebook.py')
+    py_file.write_binary(text.replace('\n', '\r\n').encode('utf-8'))
+    compare(jupytext.read(str(py_file)), jupytext.reads(text, 'py'))
+
+
+def test_metadata_of_notebook_read_from_text_are_notebook_nodes(text="""# ---
+# jupyter:
+#   kernelspec:
+#     display_name: Python 3
+#     language: python
+#     name: python3
+# ---
+
+1 + 1
+"""):
+    nb = jupytext.reads(text, 'py')
+    assert isinstance(nb.metadata, NotebookNode)
+    assert nb.metadata.kernelspec.name == 'python3'
+
+
+@pytest.mark.parametrize('fmt', ['ipynb', 'py:percent'])
+def test_write_prepares_the_metadata_once(fmt, tmpdir):
+    nb = new_notebook(cells=[new_markdown_cell('Some text')])
+    nb_file = str(tmpdir.join('notebook.' + fmt.split(':')[0]))
+    with mock.patch('jupytext.jupytext.metadata_and_format_for_writing',
+                    wraps=jupytext.jupytext.metadata_and_format_for_writing) as metadata_and_format_for_writing:
+        jupytext.write(nb, nb_file, fmt=fmt)
+    assert metadata_and_format_for_writing.call_count == 1
+
+
+@pytest.mark.parametrize('ext,fmt', product(['.ipynb', '.py'], [{'bogus': 1}, {'comment_magics': 'yes'}]))
+def test_read_file_with_invalid_format_raises(ext, fmt, tmpdir):
+    nb_file = str(tmpdir.join('notebook' + ext))
+    jupytext.write(new_notebook(cells=[new_markdown_cell('Some text')]), nb_file)
+    with pytest.raises(JupytextFormatError):
+        jupytext.read(nb_file, fmt=fmt)
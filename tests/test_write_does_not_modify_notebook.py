@@ -21,3 +21,12 @@ def test_write_notebook_does_not_change_it(nb_file, fmt, tmpdir):
     tmp_dest = str(tmpdir.join('notebook' + ext))
     write(nb_org, tmp_dest, fmt=fmt)
     compare(nb_org, nb_org_copied)
+
+
+@pytest.mark.parametrize('nb_file', list_notebooks('ipynb_py'))
+def test_write_notebook_as_sphinx_does_not_change_it(nb_file):
+    nb_org = read(nb_file)
+    nb_org_copied = deepcopy(nb_org)
+
+    writes(nb_org, 'py:sphinx')
+    compare(nb_org, nb_org_copied)